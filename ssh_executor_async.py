@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Async SSH Command Executor
+Runs all commands concurrently over one multiplexed asyncssh connection.
+A single event loop drives every session — no worker threads and no extra
+key exchanges beyond the initial connection.
+"""
+
+import asyncio
+import logging
+from typing import List, Optional
+
+import asyncssh
+
+logger = logging.getLogger(__name__)
+
+
+async def execute_commands(hostname: str, username: str, commands: List[str],
+                           password: Optional[str] = None, key_filename: Optional[str] = None,
+                           port: int = 22) -> List[tuple[int, str, str]]:
+    """
+    Execute commands concurrently over one asyncssh connection.
+
+    Args:
+        hostname: Remote server hostname or IP
+        username: SSH username
+        commands: Commands to execute
+        password: SSH password (optional if using key)
+        key_filename: Path to private key file (optional)
+        port: SSH port (default: 22)
+
+    Returns:
+        List of (exit_code, stdout, stderr) tuples in command order
+    """
+    connect_kwargs = {
+        "host": hostname,
+        "port": port,
+        "username": username,
+        "known_hosts": None,
+    }
+    if key_filename:
+        connect_kwargs["client_keys"] = [key_filename]
+    elif password:
+        connect_kwargs["password"] = password
+
+    logger.info("Connecting to %s:%s as %s (asyncssh)", hostname, port, username)
+    async with asyncssh.connect(**connect_kwargs) as conn:
+        logger.info("Executing %s commands concurrently on one connection", len(commands))
+        completed = await asyncio.gather(
+            *(conn.run(command, check=False) for command in commands),
+            return_exceptions=True
+        )
+
+    results = []
+    for command, result in zip(commands, completed):
+        if isinstance(result, BaseException):
+            logger.error("Error executing command '%s': %s", command, result)
+            results.append((-1, "", str(result)))
+        else:
+            results.append((result.exit_status if result.exit_status is not None else -1,
+                            result.stdout, result.stderr))
+    return results
+
+
+def run(args) -> bool:
+    """
+    Load the commands file and run it through the async executor.
+
+    Args:
+        args: Parsed argparse namespace from ssh_executor.main
+
+    Returns:
+        True if all commands executed successfully, False otherwise
+    """
+    from ssh_executor import SSHCommandExecutor
+
+    loader = SSHCommandExecutor(hostname=args.hostname, username=args.username)
+    commands = loader.load_commands(args.commands_file)
+    if not commands:
+        return False
+
+    try:
+        results = asyncio.run(execute_commands(
+            hostname=args.hostname,
+            username=args.username,
+            commands=commands,
+            password=args.password,
+            key_filename=args.key_file,
+            port=args.port
+        ))
+    except (OSError, asyncssh.Error) as e:
+        logger.error("SSH connection error: %s", e)
+        return False
+
+    success_count = 0
+    for command, (exit_code, stdout, stderr) in zip(commands, results):
+        print("-" * 40)
+        print(f"COMMAND: {command}")
+        if stdout:
+            print(f"STDOUT:\n{stdout}")
+        if stderr:
+            print(f"STDERR:\n{stderr}")
+
+        if exit_code == 0:
+            success_count += 1
+        else:
+            logger.error("Command failed (exit code %s): %s", exit_code, command)
+        print("-" * 40)
+
+    logger.info("Execution complete: %s/%s commands successful", success_count, len(commands))
+    return success_count == len(commands)
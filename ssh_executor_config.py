@@ -6,8 +6,8 @@ Uses config.json for connection parameters.
 """
 
 import json
-import os
 import sys
+import ssh_pool
 from ssh_executor import SSHCommandExecutor
 
 
@@ -30,17 +30,14 @@ def load_config(config_file: str = "config.json") -> dict:
         "commands_file": "commands.txt"
     }
     
-    if not os.path.exists(config_file):
-        print(f"Configuration file {config_file} not found. Creating template...")
-        with open(config_file, 'w') as f:
-            json.dump(default_config, f, indent=4)
-        print(f"Please edit {config_file} with your SSH connection details")
-        return None
-    
     try:
-        with open(config_file, 'r') as f:
-            config = json.load(f)
-        
+        # Read the whole file in one unbuffered pass and parse the bytes
+        # directly; json.loads accepts UTF-8 bytes. A missing file surfaces
+        # as FileNotFoundError below, so no separate existence check is made.
+        with open(config_file, 'rb', buffering=0) as f:
+            config = json.loads(f.read())
+
+
         # Validate required fields
         if not config.get("hostname") or not config.get("username"):
             print("Error: hostname and username are required in config file")
@@ -48,6 +45,12 @@ def load_config(config_file: str = "config.json") -> dict:
         
         return config
     
+    except FileNotFoundError:
+        print(f"Configuration file {config_file} not found. Creating template...")
+        with open(config_file, 'w') as f:
+            json.dump(default_config, f, indent=4)
+        print(f"Please edit {config_file} with your SSH connection details")
+        return None
     except json.JSONDecodeError as e:
         print(f"Error parsing configuration file: {e}")
         return None
@@ -63,7 +66,19 @@ def main():
     config = load_config(config_file)
     if not config:
         sys.exit(1)
-    
+
+    # Prefer the connection-pool daemon: it keeps the SSH connection open
+    # across invocations so repeated runs skip the key exchange. Fall back
+    # to a direct connection when the pool cannot be reached.
+    pooled = ssh_pool.run_from_config(config)
+    if pooled is not None:
+        if pooled:
+            print("All commands executed successfully")
+        else:
+            print("Some commands failed to execute")
+            sys.exit(1)
+        return
+
     # Create SSH executor instance
     executor = SSHCommandExecutor(
         hostname=config["hostname"],
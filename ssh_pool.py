@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+SSH Connection Pool
+A small per-user daemon that keeps paramiko connections open across script
+invocations so repeated runs skip the TCP handshake and key exchange.
+Clients talk to it over a unix domain socket; connections idle longer than
+IDLE_TIMEOUT are evicted. Callers fall back to a direct connection whenever
+the pool is unavailable.
+"""
+
+import base64
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SOCKET_PATH = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR", os.path.expanduser("~/.ssh")),
+    "ssh-commands-pool.sock"
+)
+IDLE_TIMEOUT = 300  # seconds a pooled connection may sit unused
+CONNECT_RETRIES = 10  # client attempts while a freshly spawned daemon binds
+
+
+class PoolDaemon:
+    """Holds open SSH connections keyed by destination and serves commands."""
+
+    def __init__(self, socket_path: str = SOCKET_PATH):
+        self.socket_path = socket_path
+        self.executors = {}  # (hostname, username, port, key_filename) -> executor
+        self.last_used = {}
+        self.lock = threading.Lock()
+
+    def _get_executor(self, request: dict):
+        """Fetch or create the pooled connection for the request's destination."""
+        from ssh_executor import SSHCommandExecutor
+
+        key = (request["hostname"], request["username"],
+               request.get("port", 22), request.get("key_filename") or "")
+        with self.lock:
+            executor = self.executors.get(key)
+            if executor is not None:
+                transport = executor.client.get_transport() if executor.client else None
+                if transport is None or not transport.is_active():
+                    executor.disconnect()
+                    executor = None
+                    del self.executors[key]
+
+            if executor is None:
+                executor = SSHCommandExecutor(
+                    hostname=request["hostname"],
+                    username=request["username"],
+                    password=request.get("password") or None,
+                    key_filename=request.get("key_filename") or None,
+                    port=request.get("port", 22)
+                )
+                if not executor.connect():
+                    return None
+                self.executors[key] = executor
+
+            self.last_used[key] = time.monotonic()
+            return executor
+
+    def _evict_idle(self):
+        """Periodically drop connections that have sat idle too long."""
+        while True:
+            time.sleep(IDLE_TIMEOUT / 10)
+            now = time.monotonic()
+            with self.lock:
+                for key in list(self.executors):
+                    if now - self.last_used.get(key, 0) > IDLE_TIMEOUT:
+                        logger.info("Evicting idle pooled connection to %s", key[0])
+                        self.executors.pop(key).disconnect()
+                        self.last_used.pop(key, None)
+
+    def _handle(self, conn: socket.socket):
+        """Serve one request: a JSON line in, a JSON line out."""
+        try:
+            with conn:
+                data = bytearray()
+                while not data.endswith(b"\n"):
+                    chunk = conn.recv(65536)
+                    if not chunk:
+                        return
+                    data += chunk
+                request = json.loads(data)
+
+                executor = self._get_executor(request)
+                if executor is None:
+                    response = {"error": "pool failed to connect"}
+                else:
+                    # Each request runs on its own exec channel: concurrent
+                    # clients hitting the same destination would otherwise
+                    # interleave send/recv on the executor's single shared
+                    # shell channel and cross-deliver each other's output.
+                    # Opening a session on the shared transport is
+                    # thread-safe in paramiko.
+                    exit_code, stdout, stderr = executor.execute_command(request["command"], use_shell=False)
+                    response = {
+                        "exit_code": exit_code,
+                        "stdout": base64.b64encode(stdout).decode('ascii'),
+                        "stderr": base64.b64encode(stderr).decode('ascii'),
+                    }
+                conn.sendall(json.dumps(response).encode('utf-8') + b"\n")
+        except Exception as e:
+            logger.error("Pool request failed: %s", e)
+
+    def serve(self):
+        """Bind the socket and serve requests until killed."""
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        server.listen(16)
+        logger.info("SSH pool daemon listening on %s", self.socket_path)
+
+        threading.Thread(target=self._evict_idle, daemon=True).start()
+        while True:
+            conn, _ = server.accept()
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+
+def _spawn_daemon():
+    """Start the daemon detached so it outlives this invocation."""
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--daemon"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
+def execute_pooled(config: dict, command: str):
+    """
+    Run one command through the pool daemon.
+
+    Spawns the daemon on first use. Returns (exit_code, stdout, stderr) as
+    bytes, or None if the pool cannot be reached so the caller can fall back.
+    """
+    request = (json.dumps({
+        "hostname": config["hostname"],
+        "username": config["username"],
+        "password": config.get("password") or None,
+        "key_filename": config.get("key_filename") or None,
+        "port": config.get("port", 22),
+        "command": command,
+    }) + "\n").encode('utf-8')
+
+    spawned = False
+    for _ in range(CONNECT_RETRIES):
+        try:
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(SOCKET_PATH)
+            break
+        except OSError:
+            client.close()
+            if not spawned:
+                _spawn_daemon()
+                spawned = True
+            time.sleep(0.1)
+    else:
+        return None
+
+    try:
+        with client:
+            client.sendall(request)
+            data = bytearray()
+            while not data.endswith(b"\n"):
+                chunk = client.recv(65536)
+                if not chunk:
+                    return None
+                data += chunk
+    except OSError as e:
+        logger.error("Pool request failed: %s", e)
+        return None
+
+    response = json.loads(data)
+    if "error" in response:
+        logger.error("Pool error: %s", response["error"])
+        return None
+
+    return (response["exit_code"],
+            base64.b64decode(response["stdout"]),
+            base64.b64decode(response["stderr"]))
+
+
+def run_from_config(config: dict):
+    """
+    Execute the config's commands file through the pool.
+
+    Returns True/False for overall success, or None if the pool is
+    unavailable and the caller should fall back to a direct connection.
+    """
+    from ssh_executor import SSHCommandExecutor, _write_output
+
+    loader = SSHCommandExecutor(hostname=config["hostname"], username=config["username"])
+    commands = loader.load_commands(config.get("commands_file", "commands.txt"))
+    if not commands:
+        return False
+
+    success_count = 0
+    for i, command in enumerate(commands, 1):
+        result = execute_pooled(config, command)
+        if result is None:
+            # Pool went away mid-run (or never came up): let the caller redo
+            # the whole file over a direct connection.
+            return None
+
+        exit_code, stdout, stderr = result
+        if stdout:
+            _write_output(b"STDOUT:\n", stdout)
+        if stderr:
+            _write_output(b"STDERR:\n", stderr)
+
+        if exit_code == 0:
+            success_count += 1
+        else:
+            logger.error("Command failed: %s", command)
+
+    logger.info("Execution complete: %s/%s commands successful", success_count, len(commands))
+    return success_count == len(commands)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--daemon":
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        PoolDaemon().serve()
+    else:
+        print("This module backs the connection pool. Start the daemon with: python ssh_pool.py --daemon")